@@ -1,8 +1,28 @@
-from setuptools import setup, find_packages
+import logging
+
+from setuptools import setup, find_packages, Extension
+from setuptools.command.build_ext import build_ext
+
+log = logging.getLogger(__name__)
 
 with open("README.md") as f:
     LONG_DESC = f.read()
 
+
+class OptionalBuildExt(build_ext):
+    """Attempts to build the C step kernel, but never fails the install.
+
+    The package falls back to the Numba or pure-NumPy implementations at
+    runtime if `vicsek._cstep` is not importable.
+    """
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except Exception as e:
+            log.warning(f"Could not build optional extension {ext.name}: {e}")
+
+
 setup(
     name="vicsek",
     version=0.3,
@@ -11,6 +31,15 @@ setup(
     url="https://github.com/marshrossney/vicsek",
     long_description=LONG_DESC,
     package=find_packages(),
+    ext_modules=[
+        Extension(
+            "vicsek._cstep",
+            sources=["vicsek/_cstep.c"],
+            extra_compile_args=["-O3", "-ffast-math"],
+            optional=True,
+        )
+    ],
+    cmdclass={"build_ext": OptionalBuildExt},
     entry_points={
         "console_scripts": [
             "vic-ani = vicsek.scripts.vic_ani:main",
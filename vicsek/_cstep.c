@@ -0,0 +1,272 @@
+/* Hand-written C implementation of the Vicsek model update.
+ *
+ * This is a drop-in alternative to the Numba kernel in vicsek/_kernels.py for
+ * environments where numba (and its LLVM dependency) cannot be installed. It
+ * performs the same work: a uniform cell list for neighbour finding (cell
+ * width at least the largest interaction radius, 3x3 block scan with periodic
+ * wrapping), a weighted sum of the heading unit vectors over each
+ * neighbourhood, normalisation, rotation by the pre-generated noise angle,
+ * and the position update with compare-and-subtract wrapping.
+ *
+ * Arrays are accessed through the buffer protocol and must be C-contiguous
+ * float64. The GIL is released for the duration of the computation, so
+ * Python-level threads can evolve independent models concurrently.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#include <stdlib.h>
+
+static void
+step_kernel(const double *positions, const double *heading_x,
+            const double *heading_y, const double *speed, const double *radius,
+            const double *weights, const double *perturbations, double length,
+            Py_ssize_t n, Py_ssize_t n_cells, Py_ssize_t *cell,
+            Py_ssize_t *starts, Py_ssize_t *fill, Py_ssize_t *order,
+            double *out_positions, double *out_heading_x, double *out_heading_y)
+{
+    const double half_length = 0.5 * length;
+    const double cell_width = length / (double)n_cells;
+    Py_ssize_t p, c, i;
+
+    /* Counting sort of the particles by linearised cell index */
+    for (p = 0; p < n; p++) {
+        Py_ssize_t cx = (Py_ssize_t)(positions[2 * p] / cell_width);
+        Py_ssize_t cy = (Py_ssize_t)(positions[2 * p + 1] / cell_width);
+        if (cx >= n_cells)
+            cx = n_cells - 1;
+        if (cy >= n_cells)
+            cy = n_cells - 1;
+        cell[p] = cx * n_cells + cy;
+    }
+    for (c = 0; c < n_cells * n_cells + 1; c++)
+        starts[c] = 0;
+    for (p = 0; p < n; p++)
+        starts[cell[p] + 1] += 1;
+    for (c = 0; c < n_cells * n_cells; c++)
+        starts[c + 1] += starts[c];
+    for (c = 0; c < n_cells * n_cells; c++)
+        fill[c] = starts[c];
+    for (p = 0; p < n; p++) {
+        c = cell[p];
+        order[fill[c]] = p;
+        fill[c] += 1;
+    }
+
+    for (i = 0; i < n; i++) {
+        const double xi = positions[2 * i];
+        const double yi = positions[2 * i + 1];
+        double sum_x = 0.0;
+        double sum_y = 0.0;
+        double norm, mean_x, mean_y, cos_eps, sin_eps, new_x, new_y;
+        double x_new, y_new;
+        Py_ssize_t ox, oy, k, j;
+
+        if (n_cells < 3) {
+            /* Too few cells for a distinct 3x3 block; use all pairs */
+            for (j = 0; j < n; j++) {
+                double dx = positions[2 * j] - xi;
+                double dy = positions[2 * j + 1] - yi;
+                if (dx > half_length)
+                    dx -= length;
+                else if (dx < -half_length)
+                    dx += length;
+                if (dy > half_length)
+                    dy -= length;
+                else if (dy < -half_length)
+                    dy += length;
+                if (dx * dx + dy * dy < radius[j] * radius[j]) {
+                    sum_x += weights[j] * heading_x[j];
+                    sum_y += weights[j] * heading_y[j];
+                }
+            }
+        } else {
+            Py_ssize_t cxi = (Py_ssize_t)(xi / cell_width);
+            Py_ssize_t cyi = (Py_ssize_t)(yi / cell_width);
+            if (cxi >= n_cells)
+                cxi = n_cells - 1;
+            if (cyi >= n_cells)
+                cyi = n_cells - 1;
+            for (ox = -1; ox < 2; ox++) {
+                Py_ssize_t cx = (cxi + ox + n_cells) % n_cells;
+                for (oy = -1; oy < 2; oy++) {
+                    Py_ssize_t cy = (cyi + oy + n_cells) % n_cells;
+                    c = cx * n_cells + cy;
+                    for (k = starts[c]; k < starts[c + 1]; k++) {
+                        double dx, dy;
+                        j = order[k];
+                        dx = positions[2 * j] - xi;
+                        dy = positions[2 * j + 1] - yi;
+                        if (dx > half_length)
+                            dx -= length;
+                        else if (dx < -half_length)
+                            dx += length;
+                        if (dy > half_length)
+                            dy -= length;
+                        else if (dy < -half_length)
+                            dy += length;
+                        if (dx * dx + dy * dy < radius[j] * radius[j]) {
+                            sum_x += weights[j] * heading_x[j];
+                            sum_y += weights[j] * heading_y[j];
+                        }
+                    }
+                }
+            }
+        }
+
+        /* Normalise the summed heading vector; a zero sum means no preferred
+         * direction, for which arctan2(0, 0) = 0 would give heading (1, 0) */
+        norm = sqrt(sum_x * sum_x + sum_y * sum_y);
+        if (norm > 0.0) {
+            mean_x = sum_x / norm;
+            mean_y = sum_y / norm;
+        } else {
+            mean_x = 1.0;
+            mean_y = 0.0;
+        }
+
+        /* Rotate the mean heading by the noise angle */
+        cos_eps = cos(perturbations[i]);
+        sin_eps = sin(perturbations[i]);
+        new_x = mean_x * cos_eps - mean_y * sin_eps;
+        new_y = mean_x * sin_eps + mean_y * cos_eps;
+
+        out_heading_x[i] = new_x;
+        out_heading_y[i] = new_y;
+
+        /* Wrap back into the box with a single compare-and-subtract */
+        x_new = xi + speed[i] * new_x;
+        if (x_new >= length)
+            x_new -= length;
+        else if (x_new < 0.0)
+            x_new += length;
+        y_new = yi + speed[i] * new_y;
+        if (y_new >= length)
+            y_new -= length;
+        else if (y_new < 0.0)
+            y_new += length;
+        out_positions[2 * i] = x_new;
+        out_positions[2 * i + 1] = y_new;
+    }
+}
+
+static int
+get_buffer(PyObject *obj, Py_buffer *view, int writable, const char *name)
+{
+    int flags = PyBUF_C_CONTIGUOUS | PyBUF_FORMAT;
+    if (writable)
+        flags |= PyBUF_WRITABLE;
+    if (PyObject_GetBuffer(obj, view, flags) != 0)
+        return -1;
+    if (view->itemsize != sizeof(double)
+        || (view->format != NULL && view->format[0] != 'd')) {
+        PyErr_Format(PyExc_TypeError, "%s must be a C-contiguous float64 array",
+                     name);
+        PyBuffer_Release(view);
+        return -1;
+    }
+    return 0;
+}
+
+static PyObject *
+vicsek_step(PyObject *self, PyObject *args)
+{
+    PyObject *objs[10];
+    Py_buffer views[10];
+    double length;
+    Py_ssize_t n, n_cells, max_cells, i;
+    double r_max;
+    Py_ssize_t *cell = NULL, *starts = NULL, *fill = NULL, *order = NULL;
+    const char *names[10] = {
+        "positions",     "heading_x",     "heading_y",     "speed",
+        "radius",        "weights",       "perturbations", "out_positions",
+        "out_heading_x", "out_heading_y",
+    };
+    const double *radius;
+
+    if (!PyArg_ParseTuple(args, "OOOOOOOdOOO", &objs[0], &objs[1], &objs[2],
+                          &objs[3], &objs[4], &objs[5], &objs[6], &length,
+                          &objs[7], &objs[8], &objs[9]))
+        return NULL;
+
+    for (i = 0; i < 10; i++) {
+        if (get_buffer(objs[i], &views[i], i >= 7, names[i]) != 0) {
+            while (i > 0)
+                PyBuffer_Release(&views[--i]);
+            return NULL;
+        }
+    }
+
+    n = views[1].len / (Py_ssize_t)sizeof(double);
+
+    radius = (const double *)views[4].buf;
+    r_max = 0.0;
+    for (i = 0; i < n; i++) {
+        if (radius[i] > r_max)
+            r_max = radius[i];
+    }
+    n_cells = (r_max > 0.0) ? (Py_ssize_t)(length / r_max) : 1;
+    if (n_cells < 1)
+        n_cells = 1;
+    /* Cap the resolution at ~sqrt(n) cells per side, keeping the grid O(n):
+     * wider cells are always safe (correctness only needs
+     * cell_width >= r_max) and more cells than particles gains nothing */
+    max_cells = (Py_ssize_t)sqrt((double)n);
+    if (max_cells < 1)
+        max_cells = 1;
+    if (n_cells > max_cells)
+        n_cells = max_cells;
+
+    cell = malloc((size_t)n * sizeof(Py_ssize_t));
+    starts = malloc((size_t)(n_cells * n_cells + 1) * sizeof(Py_ssize_t));
+    fill = malloc((size_t)(n_cells * n_cells) * sizeof(Py_ssize_t));
+    order = malloc((size_t)n * sizeof(Py_ssize_t));
+    if (cell == NULL || starts == NULL || fill == NULL || order == NULL) {
+        free(cell);
+        free(starts);
+        free(fill);
+        free(order);
+        for (i = 0; i < 10; i++)
+            PyBuffer_Release(&views[i]);
+        return PyErr_NoMemory();
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    step_kernel((const double *)views[0].buf, (const double *)views[1].buf,
+                (const double *)views[2].buf, (const double *)views[3].buf,
+                radius, (const double *)views[5].buf,
+                (const double *)views[6].buf, length, n, n_cells, cell, starts,
+                fill, order, (double *)views[7].buf, (double *)views[8].buf,
+                (double *)views[9].buf);
+    Py_END_ALLOW_THREADS
+
+    free(cell);
+    free(starts);
+    free(fill);
+    free(order);
+    for (i = 0; i < 10; i++)
+        PyBuffer_Release(&views[i]);
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef cstep_methods[] = {
+    {"vicsek_step", vicsek_step, METH_VARARGS,
+     "Performs a single Vicsek update for all particles.\n\n"
+     "Same calling convention as vicsek._kernels.vicsek_step, but all arrays\n"
+     "must be C-contiguous float64."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef cstep_module = {
+    PyModuleDef_HEAD_INIT,
+    "vicsek._cstep",
+    "C implementation of the Vicsek model update.",
+    -1,
+    cstep_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__cstep(void)
+{
+    return PyModule_Create(&cstep_module);
+}
@@ -0,0 +1,386 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import logging
+import os
+from typing import Union
+
+import numpy as np
+
+from vicsek.model import ParticleProperty, VicsekModel, expand_to_array
+
+log = logging.getLogger(__name__)
+
+
+def _evolve_replica(
+    model_params: dict,
+    seed: np.random.SeedSequence,
+    steps: int,
+    track_order_parameter: bool,
+) -> dict:
+    """Constructs, evolves and reads off a single replica. Module-level so
+    that it can be pickled and shipped to a worker process."""
+    model = VicsekModel(seed=seed, **model_params)
+    model.evolve(steps, track_order_parameter=track_order_parameter)
+    return model.trajectory
+
+
+def evolve_ensemble(
+    replicas: int,
+    steps: int,
+    *,
+    length: int,
+    density: float,
+    speed: ParticleProperty,
+    noise: ParticleProperty,
+    radius: ParticleProperty = 1,
+    weights: ParticleProperty = 1,
+    seed: Union[int, None] = None,
+    dtype: np.dtype = np.float64,
+    track_order_parameter: bool = True,
+    processes: Union[int, None] = None,
+) -> list:
+    """Evolves an ensemble of independent ``VicsekModel`` replicas, spread
+    across a pool of worker processes.
+
+    The replicas are embarrassingly parallel, so for systems large enough
+    that a single update keeps a core busy this yields a near-linear speedup
+    in the number of physical cores. For many replicas of a *small* system,
+    prefer ``VicsekEnsemble``, which batches the update instead.
+
+    Parameters
+    ----------
+    replicas : int
+        Number of independent replica systems to simulate.
+    steps : int
+        Number of updates applied to each replica.
+    length, density, speed, noise, radius, weights, dtype
+        Passed straight through to the ``VicsekModel`` constructor.
+    seed : int or None, optional
+        Seed for the ensemble as a whole. Each replica receives its own
+        independent child seed, spawned from this one, so a given seed
+        reproduces the entire ensemble. None by default.
+    track_order_parameter : bool, optional
+        If True, track the trajectory of the order parameter of each replica
+        during evolution. True by default.
+    processes : int or None, optional
+        Number of worker processes. By default, the number of CPUs.
+
+    Returns
+    -------
+    list
+        The ``trajectory`` dict of each replica, in order.
+    """
+    model_params = dict(
+        length=length,
+        density=density,
+        speed=speed,
+        noise=noise,
+        radius=radius,
+        weights=weights,
+        dtype=dtype,
+    )
+    seeds = np.random.SeedSequence(seed).spawn(replicas)
+    worker = partial(
+        _evolve_replica,
+        model_params,
+        steps=steps,
+        track_order_parameter=track_order_parameter,
+    )
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as pool:
+        trajectories = list(pool.map(worker, seeds))
+    return trajectories
+
+
+class VicsekEnsemble:
+    """
+    Class which evolves an ensemble of independent Vicsek models in lock-step.
+
+    The positions of the whole ensemble are stacked into a single array of
+    shape (replicas, particles, 2) and the heading unit vectors into arrays of
+    shape (replicas, particles), so that each update is vectorised over the
+    ensemble axis. This amortises the per-step Python overhead over all
+    replicas at once, which pays off when evolving many replicas of a smallish
+    system - e.g. to estimate the distribution of the order parameter.
+
+    Parameters
+    ----------
+    replicas : int
+        Number of independent replica systems to simulate.
+    length : int
+        Side length of square box.
+    density : float
+        Number of particles per square unit of the box.
+    speed : float or iterable
+        Magnitude of the velocity of the particles.
+    noise : float or iterable
+        Magnitude of the noise perturbation. Perturbations are drawn from a
+        uniform distribution with limits +/- ``0.5*noise``.
+    radius : float or iterable, optional
+        Interaction radius of particles. One by default.
+    weights : float or iterable, optional
+        Relative weights of the particles in the interaction term. By default
+        all particles carry the same weight.
+    seed : int or None, optional
+        Seed for random number generator. A single generator drives the whole
+        ensemble, so replicas are distinct but the ensemble as a whole is
+        reproducible. None by default.
+    dtype : data-type, optional
+        Floating-point precision of the state. ``np.float32`` roughly halves
+        the memory footprint, which matters here since each update builds a
+        dense (replicas, particles, particles) separation tensor.
+        ``np.float64`` by default.
+
+    Notes
+    -----
+    The per-particle properties (speed, noise, radius, weights) are shared by
+    all replicas and expanded exactly as in ``VicsekModel``.
+
+    Because the update materialises the full pairwise separation tensor, this
+    class is intended for the many-replicas / few-particles regime. For a
+    single large system use ``VicsekModel``, whose update only ever touches
+    pairs within the interaction radius.
+    """
+
+    def __init__(
+        self,
+        replicas: int,
+        length: int,
+        density: float,
+        speed: ParticleProperty,
+        noise: ParticleProperty,
+        radius: ParticleProperty = 1,
+        weights: ParticleProperty = 1,
+        seed: Union[int, None] = None,
+        dtype: np.dtype = np.float64,
+    ):
+
+        self._dtype = np.dtype(dtype)  # must precede the property setters
+        self._replicas = replicas
+        self._length = length
+        self._density = density
+        self.speed = speed
+        self.noise = noise
+        self.radius = radius
+        self.weights = weights
+
+        self.init_state(seed=seed)
+
+    # --------------------------------------------------------------------------------
+    #                                                             | Data descriptors |
+    #                                                             --------------------
+
+    @property
+    def speed(self) -> np.ndarray:
+        """Magnitude of the velocity of the particles."""
+        return self._speed
+
+    @speed.setter
+    @expand_to_array
+    def speed(self, new: ParticleProperty):
+        """Setter for speed."""
+        self._speed = new
+
+    @property
+    def noise(self) -> np.ndarray:
+        """Magnitude of the random scalar noise that perturbs the heading."""
+        return self._noise
+
+    @noise.setter
+    @expand_to_array
+    def noise(self, new: ParticleProperty):
+        """Setter for noise."""
+        self._noise = new
+
+    @property
+    def radius(self) -> np.ndarray:
+        """Radius of interaction."""
+        return self._radius
+
+    @radius.setter
+    @expand_to_array
+    def radius(self, new: ParticleProperty):
+        """Setter for radius."""
+        self._radius = new
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Array containing the relative weights of the particles."""
+        return self._weights
+
+    @weights.setter
+    @expand_to_array
+    def weights(self, new: ParticleProperty):
+        """Setter for weights."""
+        if np.any(new < 0):
+            raise ValueError("The weights must be positive.")
+        self._weights = new
+
+    # --------------------------------------------------------------------------------
+    #                                                         | Read-only properties |
+    #                                                         ------------------------
+
+    @property
+    def replicas(self) -> int:
+        """Number of independent replica systems."""
+        return self._replicas
+
+    @property
+    def length(self) -> int:
+        """Side length of the square box containing each replica."""
+        return self._length
+
+    @property
+    def density(self) -> float:
+        """Number density of particles in the box."""
+        return self._density
+
+    @property
+    def particles(self) -> int:
+        """Number of particles in each replica."""
+        return int(self._density * self.length ** 2)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Floating-point precision of the state and particle properties."""
+        return self._dtype
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Array of shape (replicas, particles, 2) containing the x and y
+        coordinates of the particles in each replica."""
+        return self._positions
+
+    @property
+    def headings(self) -> np.ndarray:
+        """Array of shape (replicas, particles) containing the headings (polar
+        angle) of the particles, derived from the stored unit vectors."""
+        return np.arctan2(self._heading_y, self._heading_x)
+
+    @property
+    def order_parameter(self) -> np.ndarray:
+        """Array of length replicas containing the magnitude of the combined
+        velocity of the particles in each replica, normalised to [0, 1]."""
+        vx_mean = (self._speed * self._heading_x).mean(axis=1)
+        vy_mean = (self._speed * self._heading_y).mean(axis=1)
+        return np.hypot(vx_mean, vy_mean) / self._speed.mean()
+
+    @property
+    def current_step(self) -> int:
+        """Number of steps taken since the ensemble was initialised."""
+        return self._current_step
+
+    @property
+    def trajectory(self) -> dict:
+        """A dictionary describing the trajectories of the order parameter
+        (values; one array of length replicas per entry) in terms of the number
+        of steps since initialisation (keys)."""
+        return self._trajectory
+
+    # --------------------------------------------------------------------------------
+    #                                                               | Public methods |
+    #                                                               ------------------
+
+    def init_state(self, seed: Union[int, None] = None):
+        """Initialises every replica by randomly generating positions and
+        headings.
+
+        Parameters
+        ----------
+        seed : int or None
+            Seed for random number generator. By providing a known integer one
+            can reproduce the evolution of the ensemble.
+        """
+        self._rng = np.random.default_rng(seed)
+
+        shape = (self.replicas, self.particles)
+        self._positions = (
+            self._rng.random(shape + (2,), dtype=self._dtype) * self.length
+        )
+        angles = self._rng.random(size=shape, dtype=self._dtype) * 2 * np.pi
+        self._heading_x = np.cos(angles)
+        self._heading_y = np.sin(angles)
+
+        # Scratch buffer for the per-step noise draws
+        self._perturbations = np.empty(shape, dtype=self._dtype)
+
+        self._current_step = 0
+        self._trajectory = {0: self.order_parameter}
+
+    def step(self):
+        """Performs a single step of every replica.
+
+        Notes
+        -----
+        The update builds the dense pairwise separation tensor for the whole
+        ensemble, with minimum-image (periodic) distances, and reduces the
+        weighted heading vectors with a batched matrix product.
+        """
+        positions = self._positions
+
+        separations = positions[:, :, None, :] - positions[:, None, :, :]
+        separations -= self.length * np.round(separations / self.length)
+        # adjacency[e, i, j] is one if particle j influences particle i, i.e.
+        # their separation is less than the radius of the influencer
+        adjacency = (
+            np.square(separations).sum(axis=-1) < np.square(self._radius)
+        ).astype(self._dtype)
+
+        # Sum the weighted heading vectors over each neighbourhood
+        weighted_x = self._weights * self._heading_x
+        weighted_y = self._weights * self._heading_y
+        sum_x = (adjacency @ weighted_x[:, :, None]).squeeze(-1)
+        sum_y = (adjacency @ weighted_y[:, :, None]).squeeze(-1)
+
+        # Normalise the summed vectors to unit length
+        norms = np.hypot(sum_x, sum_y)
+        degenerate = norms == 0.0
+        if degenerate.any():
+            sum_x[degenerate] = 1.0
+            norms[degenerate] = 1.0
+        sum_x /= norms
+        sum_y /= norms
+
+        # Rotate each mean heading by its noise angle. The noise is drawn
+        # straight into the preallocated buffer and scaled in place
+        perturbations = self._perturbations
+        self._rng.random(dtype=self._dtype, out=perturbations)
+        perturbations -= 0.5
+        perturbations *= self._noise
+        cos_eps = np.cos(perturbations)
+        sin_eps = np.sin(perturbations)
+        self._heading_x = sum_x * cos_eps - sum_y * sin_eps
+        self._heading_y = sum_x * sin_eps + sum_y * cos_eps
+
+        # Step forward particles
+        self._positions[..., 0] += self._speed * self._heading_x
+        self._positions[..., 1] += self._speed * self._heading_y
+
+        # Check for wrapping around the periodic boundaries. Particles move at
+        # most `speed` per step, so a single compare-and-subtract suffices and
+        # is much cheaper than a general floating-point modulo
+        wrapped = self._positions
+        np.subtract(wrapped, self.length, out=wrapped, where=wrapped >= self.length)
+        np.add(wrapped, self.length, out=wrapped, where=wrapped < 0)
+
+        # Update step counter
+        self._current_step += 1
+
+    def evolve(
+        self,
+        steps: int,
+        track_order_parameter: bool = False,
+    ):
+        """Evolves the whole ensemble forwards a number of steps.
+
+        Parameters
+        ----------
+        steps : int
+            Number of updates.
+        track_order_parameter : bool, optional
+            If True, update the trajectories of the order parameter during
+            evolution. False by default.
+        """
+        for _ in range(steps):
+            self.step()
+            if track_order_parameter:
+                self._trajectory[self.current_step] = self.order_parameter
@@ -6,7 +6,17 @@ from typing import Union
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
+from scipy.spatial import cKDTree
+
+try:
+    from vicsek._kernels import vicsek_step as _vicsek_step
+except ImportError:  # numba not installed
+    _vicsek_step = None
+
+try:
+    from vicsek._cstep import vicsek_step as _vicsek_step_c
+except ImportError:  # extension not built; fall back to numba or NumPy
+    _vicsek_step_c = None
 
 log = logging.getLogger(__name__)
 
@@ -28,16 +38,19 @@ def expand_to_array(setter):
 
     @wraps(setter)
     def wrapper(instance, new):
-        if not hasattr(new, "__iter__"):
-            new = [new]
-        if len(new) > instance.particles:
+        dtype = getattr(instance, "dtype", np.float64)
+        array = np.atleast_1d(np.asarray(new, dtype=dtype))
+        if array.size > instance.particles:
             raise ValueError(
-                "Too many values provided in setter: {setter}. Expected {instance.particles} but got {len(new)}"
+                f"Too many values provided in setter: {setter.__name__}. "
+                f"Expected at most {instance.particles} but got {array.size}"
             )
-        array = np.full(instance.particles, fill_value=new[-1], dtype=np.float64)
-        array[: len(new)] = new
-        array = np.flip(array)  # means 'special' ones are plotted above others
-        setter(instance, array)
+        expanded = np.empty(instance.particles, dtype=dtype)
+        expanded[: array.size] = array
+        expanded[array.size :] = array[-1]
+        # Reversed so that 'special' particles are plotted above the others;
+        # the copy makes the result C-contiguous again
+        setter(instance, expanded[::-1].copy())
 
     return wrapper
 
@@ -67,6 +80,11 @@ class VicsekModel:
     seed : int or None, optional
         Seed for random number generator. By providing a known integer one can
         reproduce the evolution of the model. None by default.
+    dtype : data-type, optional
+        Floating-point precision of the state and particle properties. Single
+        precision is ample for this model (the dynamics are dominated by the
+        explicit noise term) and halves the memory traffic, which pays off
+        when running large systems or many replicas. ``np.float64`` by default.
 
     Notes
     -----
@@ -97,8 +115,10 @@ class VicsekModel:
         radius: ParticleProperty = 1,
         weights: ParticleProperty = 1,
         seed: Union[int, None] = None,
+        dtype: np.dtype = np.float64,
     ):
 
+        self._dtype = np.dtype(dtype)  # must precede the property setters
         self.length = length
         self.density = density
         self.speed = speed
@@ -191,6 +211,11 @@ class VicsekModel:
     #                                                         | Read-only properties |
     #                                                         ------------------------
 
+    @property
+    def dtype(self) -> np.dtype:
+        """Floating-point precision of the state and particle properties."""
+        return self._dtype
+
     @property
     def positions(self) -> np.ndarray:
         """Array of shape (particles, 2) containing the x and y coordinates of the
@@ -199,15 +224,18 @@ class VicsekModel:
 
     @property
     def headings(self) -> np.ndarray:
-        """Array containing the headings (polar angle) of the particles."""
-        return self._headings
+        """Array containing the headings (polar angle) of the particles.
+
+        The state of the model is stored as heading unit vectors, so this is
+        derived on demand and wrapped to the interval (-pi, pi]."""
+        return np.arctan2(self._heading_y, self._heading_x)
 
     @property
     def velocities(self) -> np.ndarray:
         """Array of shape (particles, 2) containing the x and y components of the
         velocities of the particles."""
         return np.expand_dims(self.speed, 1) * np.stack(
-            (np.cos(self.headings), np.sin(self.headings)), axis=1
+            (self._heading_x, self._heading_y), axis=1
         )
 
     @property
@@ -218,9 +246,9 @@ class VicsekModel:
     @property
     def order_parameter(self) -> float:
         """Magnitude of the combined velocity of all particles, normalised to [0, 1]."""
-        return (
-            np.sqrt(np.square(self.velocities.mean(axis=0)).sum()) / self.speed.mean()
-        )
+        vx_mean = (self._speed * self._heading_x).mean()
+        vy_mean = (self._speed * self._heading_y).mean()
+        return np.hypot(vx_mean, vy_mean) / self._speed.mean()
 
     @property
     def current_step(self) -> int:
@@ -250,8 +278,24 @@ class VicsekModel:
         """
         self._rng = np.random.default_rng(seed)
 
-        self._positions = self._rng.random((self.particles, 2)) * self.length
-        self._headings = self._rng.random(size=self.particles) * 2 * np.pi
+        self._positions = (
+            self._rng.random((self.particles, 2), dtype=self._dtype) * self.length
+        )
+
+        # Headings are stored as unit vectors (cos, sin of the polar angle);
+        # the angle itself is only ever derived for display
+        angles = self._rng.random(size=self.particles, dtype=self._dtype) * 2 * np.pi
+        self._heading_x = np.cos(angles)
+        self._heading_y = np.sin(angles)
+
+        # Scratch buffers reused every step to keep allocations out of the
+        # hot loop: per-step displacements, and a second copy of the state
+        # for the compiled kernel to write into (swapped after each step)
+        self._displacements = np.empty_like(self._positions)
+        self._perturbations = np.empty(self.particles, dtype=self._dtype)
+        self._next_positions = np.empty_like(self._positions)
+        self._next_heading_x = np.empty_like(self._heading_x)
+        self._next_heading_y = np.empty_like(self._heading_y)
 
         self._current_step = 0
         self._trajectory = {0: self.order_parameter}
@@ -259,36 +303,178 @@ class VicsekModel:
         self._reset_flag = True
 
     def step(self):
-        """Performs a single step for all particles."""
-        # Generate adjacency matrix - true if separation less than radius
-        distance_matrix = squareform(pdist(self.positions))
-        adjacency_matrix = distance_matrix < self.radius
-
-        # Average over current headings of particles within radius
-        headings_matrix = np.ma.array(
-            np.broadcast_to(self.headings, (self.particles, self.particles)),
-            mask=~adjacency_matrix,
+        """Performs a single step for all particles.
+
+        Notes
+        -----
+        Separations are minimum-image (periodic) distances, and only pairs
+        closer than the interaction radius are ever touched. If `numba` is
+        installed the entire update runs as a single compiled, parallel pass
+        over the particles (see ``vicsek._kernels``); failing that, the C
+        extension ``vicsek._cstep`` is used if it was built (float64 only);
+        otherwise a vectorised NumPy update is used.
+        """
+        # Draw the noise straight into the preallocated buffer and scale it
+        # in place, avoiding per-step temporaries
+        perturbations = self._perturbations
+        self._rng.random(dtype=self._dtype, out=perturbations)
+        perturbations -= 0.5
+        perturbations *= self._noise
+
+        if _vicsek_step is not None:
+            self._step_compiled(_vicsek_step, perturbations)
+        elif _vicsek_step_c is not None and self._dtype == np.float64:
+            self._step_compiled(_vicsek_step_c, perturbations)
+        else:
+            self._step_numpy(perturbations)
+
+        # Update step counter
+        self._current_step += 1
+
+    def _step_compiled(self, kernel, perturbations: np.ndarray):
+        """Single update of all particles via a compiled kernel (either the
+        Numba kernel or the C extension, which share a calling convention)."""
+        kernel(
+            self._positions,
+            self._heading_x,
+            self._heading_y,
+            self._speed,
+            self._radius,
+            self._weights,
+            perturbations,
+            float(self.length),
+            self._next_positions,
+            self._next_heading_x,
+            self._next_heading_y,
         )
-        sum_of_sines = (self.weights * np.sin(headings_matrix)).sum(axis=1)
-        sum_of_cosines = (self.weights * np.cos(headings_matrix)).sum(axis=1)
 
-        # Set new headings
-        self._headings = (
-            np.arctan2(sum_of_sines, sum_of_cosines)  # interactions
-            + (self._rng.random(self.particles) - 0.5) * self.noise  # noise
+        # Swap the double buffers rather than copying
+        self._positions, self._next_positions = self._next_positions, self._positions
+        self._heading_x, self._next_heading_x = (
+            self._next_heading_x,
+            self._heading_x,
+        )
+        self._heading_y, self._next_heading_y = (
+            self._next_heading_y,
+            self._heading_y,
         )
 
-        # Step forward particles
-        self._positions += np.expand_dims(self.speed, 1) * np.stack(
-            (np.cos(self.headings), np.sin(self.headings)),
-            axis=1,
+    def _neighbour_pairs(self, unique_pairs: bool = False) -> tuple:
+        """Returns arrays ``(i_idx, j_idx)`` of index pairs (excluding
+        self-pairs) such that particle ``j_idx[k]`` influences the heading of
+        particle ``i_idx[k]``, i.e. their minimum-image separation is less than
+        the radius of the influencer.
+
+        Pairs are generated by a periodic k-d tree, whose traversal runs in
+        C and only ever yields pairs within the maximum interaction radius -
+        the dense distance matrix is never formed.
+
+        Parameters
+        ----------
+        unique_pairs : bool, optional
+            If True, return each unordered pair exactly once (``i_idx <
+            j_idx``). Only meaningful when the interaction is symmetric, i.e.
+            all particles share the same radius. False by default.
+        """
+        tree = cKDTree(self._positions, boxsize=self.length)
+
+        if unique_pairs:
+            pairs = tree.query_pairs(
+                r=float(self._radius[0]), output_type="ndarray"
+            )
+            return pairs[:, 0], pairs[:, 1]
+
+        # Heterogeneous radii: collect every directed pair within the maximum
+        # radius as a sparse (COO) matrix of separations, then keep those
+        # closer than the radius of the influencer
+        coo = tree.sparse_distance_matrix(
+            tree, max_distance=float(self._radius.max()), output_type="coo_matrix"
         )
+        within_radius = (coo.data < self._radius[coo.col]) & (coo.row != coo.col)
+        return coo.row[within_radius], coo.col[within_radius]
+
+    def _step_numpy(self, perturbations: np.ndarray):
+        """Single update of all particles using vectorised NumPy operations,
+        with neighbours found via a periodic k-d tree."""
+        # Sum the weighted heading vectors of the particles within radius
+        weighted_x = self._weights * self._heading_x
+        weighted_y = self._weights * self._heading_y
+
+        # Each particle's own contribution, which the strict
+        # `separation < radius` criterion only admits for a positive radius
+        self_x = np.where(self._radius > 0, weighted_x, 0)
+        self_y = np.where(self._radius > 0, weighted_y, 0)
+
+        if np.all(self._radius == self._radius[0]):
+            # Interaction is symmetric, so visit each pair once, scatter its
+            # contribution to both ends, and add each particle's own term
+            i_idx, j_idx = self._neighbour_pairs(unique_pairs=True)
+            sum_x = (
+                np.bincount(
+                    i_idx, weights=weighted_x[j_idx], minlength=self.particles
+                )
+                + np.bincount(
+                    j_idx, weights=weighted_x[i_idx], minlength=self.particles
+                )
+                + self_x
+            )
+            sum_y = (
+                np.bincount(
+                    i_idx, weights=weighted_y[j_idx], minlength=self.particles
+                )
+                + np.bincount(
+                    j_idx, weights=weighted_y[i_idx], minlength=self.particles
+                )
+                + self_y
+            )
+        else:
+            i_idx, j_idx = self._neighbour_pairs()
+            sum_x = (
+                np.bincount(
+                    i_idx, weights=weighted_x[j_idx], minlength=self.particles
+                )
+                + self_x
+            )
+            sum_y = (
+                np.bincount(
+                    i_idx, weights=weighted_y[j_idx], minlength=self.particles
+                )
+                + self_y
+            )
 
-        # Check for wrapping around the periodic boundaries
-        np.mod(self._positions, self.length, out=self._positions)
+        # Normalise the summed vectors to unit length. A zero sum means no
+        # preferred direction, for which arctan2(0, 0) = 0 would have given
+        # the heading (1, 0)
+        norms = np.hypot(sum_x, sum_y)
+        degenerate = norms == 0.0
+        if degenerate.any():
+            sum_x[degenerate] = 1.0
+            norms[degenerate] = 1.0
+        sum_x /= norms
+        sum_y /= norms
+
+        # Rotate each mean heading by its noise angle; the sin/cos of the
+        # perturbations is now the only trig evaluated per step
+        cos_eps = np.cos(perturbations)
+        sin_eps = np.sin(perturbations)
+        np.multiply(sum_x, cos_eps, out=self._heading_x)
+        self._heading_x -= sum_y * sin_eps
+        np.multiply(sum_x, sin_eps, out=self._heading_y)
+        self._heading_y += sum_y * cos_eps
 
-        # Update step counter
-        self._current_step += 1
+        # Step forward particles
+        np.multiply(self._speed, self._heading_x, out=self._displacements[:, 0])
+        np.multiply(self._speed, self._heading_y, out=self._displacements[:, 1])
+        self._positions += self._displacements
+
+        # Check for wrapping around the periodic boundaries. Particles move at
+        # most `speed` per step, so a single compare-and-subtract suffices and
+        # is much cheaper than a general floating-point modulo
+        positions = self._positions
+        np.subtract(
+            positions, self.length, out=positions, where=positions >= self.length
+        )
+        np.add(positions, self.length, out=positions, where=positions < 0)
 
     def evolve(
         self,
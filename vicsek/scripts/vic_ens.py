@@ -2,10 +2,11 @@ import logging
 from pathlib import Path
 
 import matplotlib.pyplot as plt
+import numpy as np
 from tqdm.autonotebook import tqdm
 
 from vicsek.config import parser
-from vicsek.model import VicsekModel
+from vicsek.ensemble import VicsekEnsemble
 
 log = logging.getLogger(__name__)
 
@@ -33,38 +34,32 @@ def main():
     if args.style is not None:
         plt.style.use(args.style)
 
-    ensemble = [
-        VicsekModel(
-            length=args.length,
-            density=args.density,
-            speed=args.speed,
-            noise=args.noise,
-            radius=args.radius,
-            weights=args.weights,
-            seed=args.seed,
-        )
-        for _ in range(args.ensemble_size)
-    ]
+    ensemble = VicsekEnsemble(
+        replicas=args.ensemble_size,
+        length=args.length,
+        density=args.density,
+        speed=args.speed,
+        noise=args.noise,
+        radius=args.radius,
+        weights=args.weights,
+        seed=args.seed,
+    )
 
     steps = 100
     finished = False
     while not finished:
-        pbar = tqdm(total=len(ensemble), desc="Completed 0 simulations")
-
-        for i, replica in enumerate(ensemble):
-
-            replica.evolve(steps, track_order_parameter=True)
-
-            pbar.set_description(f"Completed {i + 1} simulations")
-            pbar.update()
-
-        pbar.close()
+        for _ in tqdm(
+            range(steps), desc=f"Evolving {args.ensemble_size} replicas"
+        ):
+            ensemble.evolve(1, track_order_parameter=True)
 
         fig, ax = plt.subplots()
         ax.set_xlabel("Steps")
         ax.set_ylabel("Order Parameter")
-        for replica in ensemble:
-            ax.plot(replica.trajectory.keys(), replica.trajectory.values())
+        ax.plot(
+            list(ensemble.trajectory.keys()),
+            np.stack(list(ensemble.trajectory.values())),
+        )
 
         plt.show()
 
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import vicsek.model
+from vicsek.model import VicsekModel
+
+
+def _single_step(**kwargs):
+    """Constructs a model from a fixed seed, steps it once with whichever
+    backend step() currently dispatches to, and returns its state."""
+    model = VicsekModel(10, 1, speed=0.5, noise=0.3, seed=12345, **kwargs)
+    model.step()
+    return model.positions, model.velocities
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"radius": [0.5, 2.0], "weights": [2, 1]},
+        {"radius": [0.0, 1.0]},
+        {"radius": 0},
+        {"dtype": np.float32},
+    ],
+)
+def test_backends_agree(monkeypatch, kwargs):
+    """Every available backend (numba kernel, C extension, NumPy fallback)
+    must produce the same physics from identical state."""
+    # The always-available NumPy fallback is the reference
+    monkeypatch.setattr(vicsek.model, "_vicsek_step", None)
+    monkeypatch.setattr(vicsek.model, "_vicsek_step_c", None)
+    reference_positions, reference_velocities = _single_step(**kwargs)
+    monkeypatch.undo()
+
+    if kwargs.get("dtype") is np.float32:
+        tolerance = dict(rtol=1e-5, atol=1e-5)
+    else:
+        tolerance = dict(rtol=1e-9, atol=1e-12)
+
+    if vicsek.model._vicsek_step is not None:
+        positions, velocities = _single_step(**kwargs)
+        np.testing.assert_allclose(positions, reference_positions, **tolerance)
+        np.testing.assert_allclose(velocities, reference_velocities, **tolerance)
+
+    # The C extension only handles float64
+    if vicsek.model._vicsek_step_c is not None and kwargs.get("dtype") is None:
+        monkeypatch.setattr(vicsek.model, "_vicsek_step", None)
+        positions, velocities = _single_step(**kwargs)
+        np.testing.assert_allclose(positions, reference_positions, **tolerance)
+        np.testing.assert_allclose(velocities, reference_velocities, **tolerance)
@@ -0,0 +1,20 @@
+import numpy as np
+
+from vicsek.ensemble import VicsekEnsemble
+
+
+def test_shapes():
+    ensemble = VicsekEnsemble(5, 10, 1, speed=1, noise=1)
+    assert ensemble.positions.shape == (5, 100, 2)
+    assert ensemble.headings.shape == (5, 100)
+    assert ensemble.order_parameter.shape == (5,)
+
+
+def test_reproducibility():
+    ensemble1 = VicsekEnsemble(5, 10, 1, speed=1, noise=1, seed=12345)
+    ensemble2 = VicsekEnsemble(5, 10, 1, speed=1, noise=1, seed=12345)
+
+    ensemble1.evolve(steps=20)
+    ensemble2.evolve(steps=20)
+    np.testing.assert_array_equal(ensemble1.positions, ensemble2.positions)
+    np.testing.assert_array_equal(ensemble1.headings, ensemble2.headings)